@@ -1,11 +1,37 @@
+import multiprocessing
+import os
 import streamlit as st
-import json
-from fpdf import FPDF
-import google.generativeai as genai
-from utils import firebase_utils, drive_utils, payment_utils
+import orjson
+from pathlib import Path
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from utils import gencache, payment_utils, pdf_utils, task_utils
 
-# Configure Gemini API
-genai.configure(api_key=st.secrets["GEMINI"]["api_key"])
+QUESTIONS_FILE = "questions_full.json"
+
+@st.cache_resource
+def load_questions():
+    # Flattened to {domain: tiers} and {(domain, tier): questions}; tuples are shared across sessions
+    data = orjson.loads(Path(QUESTIONS_FILE).read_bytes())
+    tiers = {domain: tuple(by_tier) for domain, by_tier in data.items()}
+    questions = {(domain, tier): tuple(qs) for domain, by_tier in data.items() for tier, qs in by_tier.items()}
+    return tiers, questions
+
+# PDF layout is CPU-bound; worker processes keep it off the GIL shared by all sessions
+# forkserver: the server process already runs Tornado, gRPC and worker threads, which fork() would copy mid-state
+@st.cache_resource
+def get_pdf_pool():
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("forkserver"))
+
+def build_pdf(*args):
+    try:
+        return get_pdf_pool().submit(pdf_utils.build_pdf_bytes, *args).result()
+    except BrokenProcessPool:
+        # A crashed worker breaks the cached pool for every session; replace it and build this one in-thread
+        get_pdf_pool.clear()
+        return pdf_utils.build_pdf_bytes(*args)
 
 st.title("TAICC AI Readiness Assessment")
 
@@ -15,76 +41,94 @@ if st.button("Send OTP"):
     st.success(f"OTP sent to {email}")
     st.session_state.user_email = email
     st.session_state.payment_done = False
+    st.session_state.pop("order", None)
+    st.session_state.pop("report", None)
+    st.session_state.pop("report_task", None)
 
 # ---- Step 2: Payment ----
 if st.session_state.get("user_email") and not st.session_state.get("payment_done"):
-    order = payment_utils.create_payment(amount_inr=199)
+    # Create the order once per login instead of on every rerun
+    if "order" not in st.session_state:
+        st.session_state.order = payment_utils.create_payment(amount_inr=199)
     st.write("Pay ₹199 to start your assessment")
     if st.button("Pay Now"):
         st.session_state.payment_done = True
         st.success("Payment successful!")
 
+# Upper bound (inclusive) of each maturity level except the last
+MATURITY_BOUNDS = [1.5, 2.5, 3.5, 4.5]
+MATURITY_LABELS = ["Beginner", "Emerging", "Established", "Advanced", "AI Leader"]
+
+def determine_maturity(avg_score):
+    return MATURITY_LABELS[bisect_left(MATURITY_BOUNDS, avg_score)]
+
+@st.fragment(run_every=2)
+def poll_report_task(task):
+    # Only polls while the task is pending; the full rerun redraws the Results from session state
+    if task.done():
+        st.rerun()
+    st.info("Saving your report...")
+
+def report_status():
+    task = st.session_state.get("report_task")
+    if task is None:
+        return
+    if not task.done():
+        poll_report_task(task)
+    elif task.exception():
+        st.error(f"Could not save your report: {task.exception()}")
+    else:
+        st.success("Your report has been saved.")
+
 # ---- Step 3: Assessment ----
 if st.session_state.get("payment_done"):
-    with open("questions_full.json") as f:
-        questions = json.load(f)
+    tiers, questions = load_questions()
     
-    domain = st.selectbox("Select Domain", list(questions.keys()))
-    tier = st.selectbox("Select Tier", list(questions[domain].keys()))
+    domain = st.selectbox("Select Domain", list(tiers))
+    tier = st.selectbox("Select Tier", list(tiers[domain]))
     
-    user_answers = {}
-    for q in questions[domain][tier]:
-        ans = st.slider(q, min_value=1, max_value=5)
-        user_answers[q] = ans
+    # One editable table instead of a slider widget per question
+    answers = st.data_editor(
+        pd.DataFrame({"Question": questions[domain, tier], "Score": 1}),
+        column_config={
+            "Question": st.column_config.TextColumn(disabled=True, width="large"),
+            "Score": st.column_config.NumberColumn(min_value=1, max_value=5, step=1, required=True),
+        },
+        hide_index=True,
+        use_container_width=True,
+        key=f"answers_{domain}_{tier}",
+    )
     
     if st.button("Submit Assessment"):
-        avg_score = sum(user_answers.values())/len(user_answers)
-        # Original maturity levels
-        if avg_score <= 1.5: maturity = "Beginner"
-        elif avg_score <= 2.5: maturity = "Emerging"
-        elif avg_score <= 3.5: maturity = "Established"
-        elif avg_score <= 4.5: maturity = "Advanced"
-        else: maturity = "AI Leader"
+        avg_score = float(answers["Score"].to_numpy().mean())
+        maturity = determine_maturity(avg_score)
         
-        # Gemini Professional Report
-        prompt = f"""
-        You are an expert AI consultant. Analyze this AI readiness score: {avg_score}.
-        Provide:
-        1. Short summary paragraph for on-screen display
-        2. Weaknesses/challenges
-        3. Practical recommendations
-        4. Concluding call to action encouraging contact with TAICC
-        """
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        report_text = response.text.strip()
+        # Gemini Professional Report, streamed into a temporary preview until it completes
+        preview = st.empty()
+        with preview.container():
+            st.success(f"Your AI Maturity Level: {maturity}")
+            summary = st.empty()
+        report_text = gencache.get_or_generate(domain, tier, maturity, avg_score,
+                                               on_chunk=lambda partial: summary.markdown(partial.split("\n")[0]))
         sections = report_text.split("\n")
         
-        st.success(f"Your AI Maturity Level: {maturity}")
-        st.markdown(sections[0])
-        
         # PDF generation
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", 'B', 16)
-        pdf.cell(0, 10, "TAICC AI Readiness Assessment Report", ln=True, align="C")
-        pdf.ln(10)
-        pdf.set_font("Arial", size=12)
-        pdf.cell(0,8,f"Email: {email}", ln=True)
-        pdf.cell(0,8,f"Domain: {domain}", ln=True)
-        pdf.cell(0,8,f"Tier: {tier}", ln=True)
-        pdf.cell(0,8,f"AI Maturity Level: {maturity}", ln=True)
-        pdf.ln(10)
-        for s in sections[1:]:
-            pdf.multi_cell(0,8,s.encode('latin-1','replace').decode('latin-1'))
-            pdf.ln(5)
+        pdf_bytes = build_pdf(email, domain, tier, maturity, sections[1:])
         
-        pdf_bytes = pdf.output(dest="S").encode("latin-1")
-        st.download_button("Download PDF", data=pdf_bytes, file_name="TAICC_AI_Report.pdf", mime="application/pdf")
+        # Kept in session state so the Results survive later reruns (widget changes, status polling)
+        st.session_state.report = {"maturity": maturity, "sections": sections, "pdf_bytes": pdf_bytes}
         
-        # Upload PDF to Google Drive
-        pdf_link = drive_utils.upload_pdf_to_drive(pdf_bytes, f"{email}_AI_Report.pdf")
-        
-        # Save submission to Firebase
-        firebase_utils.save_submission({"email": email, "domain": domain, "tier": tier},
-                                       avg_score, maturity, pdf_link, payment_status="Success")
+        # Upload PDF to Google Drive and save submission to Firebase in the background
+        st.session_state.report_task = task_utils.enqueue_report(
+            pdf_bytes, f"{email}_AI_Report.pdf", {"email": email, "domain": domain, "tier": tier},
+            avg_score, maturity, payment_status="Success")
+        st.toast("Your report has been queued for saving.")
+        preview.empty()
+
+    # ---- Results ----
+    report = st.session_state.get("report")
+    if report:
+        st.success(f"Your AI Maturity Level: {report['maturity']}")
+        st.markdown(report["sections"][0])
+        st.download_button("Download PDF", data=report["pdf_bytes"], file_name="TAICC_AI_Report.pdf", mime="application/pdf")
+        report_status()
@@ -1,21 +1,46 @@
+import streamlit as st
+import threading
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 from io import BytesIO
 from googleapiclient.http import MediaIoBaseUpload
 import base64
+from utils import io_pool
 
 SCOPES = ["https://www.googleapis.com/auth/drive.file"]
 SERVICE_ACCOUNT_INFO = st.secrets["google_drive"]["credentials_json"]
 
+CHUNK_SIZE = 256 * 1024
+MAX_CALLS_PER_SECOND = 500
+
 credentials = service_account.Credentials.from_service_account_info(
     SERVICE_ACCOUNT_INFO, scopes=SCOPES
 )
-drive_service = build("drive", "v3", credentials=credentials)
+
+# httplib2 connections are not thread-safe, so each upload worker builds its own service
+_local = threading.local()
+
+drive_limiter = io_pool.RateLimiter(MAX_CALLS_PER_SECOND)
+
+def _drive_service():
+    if not hasattr(_local, "service"):
+        _local.service = build("drive", "v3", credentials=credentials, cache_discovery=False)
+    return _local.service
 
 def upload_pdf_to_drive(file_bytes, filename):
     file_metadata = {"name": filename}
-    media = MediaIoBaseUpload(BytesIO(file_bytes), mimetype="application/pdf")
-    file = drive_service.files().create(body=file_metadata, media_body=media, fields="id").execute()
-    file_id = file.get("id")
+    # Reports are usually far below one chunk; a single multipart request saves the session round-trip
+    resumable = len(file_bytes) > CHUNK_SIZE
+    media = MediaIoBaseUpload(BytesIO(file_bytes), mimetype="application/pdf",
+                              chunksize=CHUNK_SIZE, resumable=resumable)
+    request = _drive_service().files().create(body=file_metadata, media_body=media, fields="id")
+    response = None
+    while response is None:
+        with io_pool.limited(limiter=drive_limiter):
+            if resumable:
+                _, response = request.next_chunk(num_retries=3)
+            else:
+                response = request.execute(num_retries=3)
+    file_id = response.get("id")
     link = f"https://drive.google.com/uc?id={file_id}&export=download"
     return link
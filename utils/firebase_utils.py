@@ -1,17 +1,92 @@
-import pyrebase
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import firebase_admin
+import streamlit as st
 from datetime import datetime
+from firebase_admin import credentials, firestore
+from google.api_core.exceptions import Aborted, ServiceUnavailable
+from utils import io_pool
 
-firebase = pyrebase.initialize_app({
-    "apiKey": st.secrets["firebase"]["apiKey"],
-    "authDomain": st.secrets["firebase"]["authDomain"],
-    "projectId": st.secrets["firebase"]["projectId"],
-    "storageBucket": st.secrets["firebase"]["storageBucket"],
-    "messagingSenderId": st.secrets["firebase"]["messagingSenderId"],
-    "appId": st.secrets["firebase"]["appId"]
-})
+try:
+    firebase_admin.get_app()
+except ValueError:
+    firebase_admin.initialize_app(credentials.Certificate(dict(st.secrets["firebase"]["credentials_json"])))
 
-auth = firebase.auth()
-db = firebase.database()
+db = firestore.client()
+logger = logging.getLogger(__name__)
+
+# Submissions are buffered and written by a background thread in Firestore write batches
+BATCH_SIZE = 450
+FLUSH_INTERVAL = 0.5
+MAX_RETRIES = 5
+
+# Holds (data, future) pairs; the future resolves once the batch containing data is committed
+submission_queue = queue.Queue()
+_stop_flusher = threading.Event()
+
+def _commit_batch(items):
+    # Document IDs are fixed before retrying, so a commit that landed despite an error is overwritten, not duplicated
+    writes = [(db.collection("submissions").document(), data) for data in items]
+    for attempt in range(MAX_RETRIES):
+        batch = db.batch()
+        for ref, data in writes:
+            batch.set(ref, data)
+        try:
+            with io_pool.limited(cost=len(items)):
+                batch.commit()
+            return
+        except (Aborted, ServiceUnavailable):
+            if attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt * 0.1)
+
+def _drain(items, block):
+    deadline = time.monotonic() + FLUSH_INTERVAL
+    while len(items) < BATCH_SIZE:
+        timeout = deadline - time.monotonic()
+        try:
+            if block and timeout > 0:
+                items.append(submission_queue.get(timeout=timeout))
+            else:
+                items.append(submission_queue.get_nowait())
+        except queue.Empty:
+            break
+    return items
+
+def _commit_entries(entries):
+    try:
+        _commit_batch([data for data, _ in entries])
+    except Exception as e:
+        # Keep the flusher alive; callers learn about the failure through their futures
+        logger.exception("Failed to save %d submissions", len(entries))
+        for _, future in entries:
+            future.set_exception(e)
+    else:
+        for _, future in entries:
+            future.set_result(None)
+
+def _flush_forever():
+    while not _stop_flusher.is_set():
+        try:
+            first = submission_queue.get(timeout=FLUSH_INTERVAL)
+        except queue.Empty:
+            continue
+        _commit_entries(_drain([first], block=True))
+
+def flush():
+    # Let the flusher finish its in-flight batch before draining what is left
+    _stop_flusher.set()
+    _flusher.join()
+    while not submission_queue.empty():
+        _commit_entries(_drain([], block=False))
+
+_flusher = threading.Thread(target=_flush_forever, name="submission-flusher", daemon=True)
+_flusher.start()
+atexit.register(flush)
 
 def save_submission(user_data, score, maturity, pdf_link, payment_status):
     data = {
@@ -22,4 +97,15 @@ def save_submission(user_data, score, maturity, pdf_link, payment_status):
         "payment_status": payment_status,
         "timestamp": datetime.now().isoformat()
     }
-    db.child("submissions").push(data)
+    future = Future()
+    submission_queue.put((data, future))
+    return future
+
+def get_cached_report(key):
+    with io_pool.limited():
+        cached = db.collection("gemini_report_cache").document(key).get()
+    return cached.get("text") if cached.exists else None
+
+def cache_report(key, text):
+    with io_pool.limited():
+        db.collection("gemini_report_cache").document(key).set({"text": text, "timestamp": datetime.now().isoformat()})
@@ -0,0 +1,91 @@
+import math
+import google.generativeai as genai
+import streamlit as st
+from utils import firebase_utils
+
+# Gemini writes one report template per (domain, tier, maturity); the score is filled in locally
+SCORE_PLACEHOLDER = "{{SCORE}}"
+
+MATURITY_BANDS = {
+    "Beginner": (1.0, 1.5),
+    "Emerging": (1.5, 2.5),
+    "Established": (2.5, 3.5),
+    "Advanced": (3.5, 4.5),
+    "AI Leader": (4.5, 5.0),
+}
+
+# (exclusive upper bound of relative position within the band, opener phrase)
+OPENERS = (
+    (1 / 3, "sits at the lower end of"),
+    (2 / 3, "sits firmly within"),
+    (1.0, "is approaching the top of"),
+    (math.inf, "sits at the top of"),
+)
+
+PROMPT_TEMPLATE = """
+You are an expert AI consultant. Write an AI readiness report for an organisation
+in the {domain} sector ({tier}) whose AI maturity level is {maturity}.
+Wherever the numeric readiness score would appear, write the placeholder {placeholder}
+instead of a number. Keep the advice valid for any score within this maturity level.
+Provide:
+1. Short summary paragraph for on-screen display
+2. Weaknesses/challenges
+3. Practical recommendations
+4. Concluding call to action encouraging contact with TAICC
+"""
+
+# In-process copy of templates already fetched from Firestore
+_templates = {}
+
+@st.cache_resource
+def get_gemini_model():
+    genai.configure(api_key=st.secrets["GEMINI"]["api_key"])
+    return genai.GenerativeModel("gemini-1.5-flash", generation_config={"max_output_tokens": 2048})
+
+def _cache_key(domain, tier, maturity):
+    # Firestore document IDs may not contain /
+    return f"{domain}_{tier}_{maturity}".replace("/", "_")
+
+def _format_score(maturity, score):
+    # Band lower bounds are exclusive (except Beginner), so never round down onto the previous level
+    low = MATURITY_BANDS[maturity][0]
+    shown = round(score, 2)
+    if maturity != "Beginner" and shown <= low:
+        shown = math.ceil(score * 100) / 100
+    return f"{shown:.2f}"
+
+def _opener(maturity, score, shown):
+    low, high = MATURITY_BANDS[maturity]
+    position = (score - low) / (high - low)
+    phrase = next(p for bound, p in OPENERS if position < bound)
+    return f"Your score of {shown} {phrase} the {maturity} level."
+
+def _render(template, maturity, score):
+    shown = _format_score(maturity, score)
+    report_text = template.replace(SCORE_PLACEHOLDER, shown)
+    return f"{_opener(maturity, score, shown)} {report_text}"
+
+def _generate_template(domain, tier, maturity, on_chunk):
+    prompt = PROMPT_TEMPLATE.format(domain=domain, tier=tier, maturity=maturity, placeholder=SCORE_PLACEHOLDER)
+    response = get_gemini_model().generate_content(prompt, stream=True)
+    chunks = []
+    for chunk in response:
+        chunks.append(chunk.text)
+        if on_chunk:
+            on_chunk("".join(chunks))
+    # Anything other than STOP (e.g. MAX_TOKENS, SAFETY) means the template may be cut off
+    complete = response.candidates[0].finish_reason.name == "STOP"
+    return "".join(chunks).strip(), complete
+
+def get_or_generate(domain, tier, maturity, score, on_chunk=None):
+    # On a cache miss, on_chunk receives the rendered partial report while Gemini streams
+    key = _cache_key(domain, tier, maturity)
+    template = _templates.get(key) or firebase_utils.get_cached_report(key)
+    if not template:
+        stream_to = (lambda partial: on_chunk(_render(partial.lstrip(), maturity, score))) if on_chunk else None
+        template, complete = _generate_template(domain, tier, maturity, stream_to)
+        if not complete:
+            return _render(template, maturity, score)
+        firebase_utils.cache_report(key, template)
+    _templates[key] = template
+    return _render(template, maturity, score)
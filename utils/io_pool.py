@@ -0,0 +1,33 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Shared cap on outbound Firestore/Drive calls across all sessions and background threads
+MAX_CONCURRENCY = 40
+FIRESTORE_OPS_PER_SECOND = 9000  # stays under Firestore's 10k writes/sec quota
+
+class RateLimiter:
+    # Spaces operations evenly so at most ops_per_second start in any second
+    def __init__(self, ops_per_second):
+        self.ops_per_second = ops_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self, cost=1):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + cost / self.ops_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+firestore_limiter = RateLimiter(FIRESTORE_OPS_PER_SECOND)
+
+@contextmanager
+def limited(cost=1, limiter=firestore_limiter):
+    # cost is the number of operations the call performs, e.g. the writes in a batch commit.
+    # The pacing wait happens before taking a slot so throttled callers don't hold concurrency.
+    limiter.wait(cost)
+    with _slots:
+        yield
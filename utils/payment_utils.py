@@ -1,7 +1,14 @@
 import razorpay
+import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+
+# One pooled keep-alive session for all Razorpay calls, sized for concurrent Streamlit sessions
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=20))
 
 client = razorpay.Client(
+    session=session,
     auth=(st.secrets["RAZORPAY"]["key_id"], st.secrets["RAZORPAY"]["key_secret"])
 )
 
@@ -0,0 +1,35 @@
+import os
+from fpdf import FPDF
+
+# Unicode TrueType font so report text is written as-is (installed by fonts-dejavu-core in the Dockerfile)
+FONT_DIR = "/usr/share/fonts/truetype/dejavu"
+FONT_FAMILY = "DejaVu"
+
+def _set_up_fonts(pdf):
+    if not os.path.exists(os.path.join(FONT_DIR, "DejaVuSans.ttf")):
+        return "Helvetica"
+    pdf.add_font(FONT_FAMILY, "", os.path.join(FONT_DIR, "DejaVuSans.ttf"))
+    pdf.add_font(FONT_FAMILY, "B", os.path.join(FONT_DIR, "DejaVuSans-Bold.ttf"))
+    return FONT_FAMILY
+
+def build_pdf_bytes(email, domain, tier, maturity, sections):
+    pdf = FPDF()
+    family = _set_up_fonts(pdf)
+    pdf.add_page()
+    pdf.set_font(family, "B", 16)
+    pdf.cell(0, 10, "TAICC AI Readiness Assessment Report", new_x="LMARGIN", new_y="NEXT", align="C")
+    pdf.ln(10)
+    pdf.set_font(family, size=12)
+    pdf.cell(0, 8, f"Email: {email}", new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 8, f"Domain: {domain}", new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 8, f"Tier: {tier}", new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 8, f"AI Maturity Level: {maturity}", new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(10)
+    for s in sections:
+        if family == "Helvetica":
+            # Core fonts are latin-1 only
+            s = s.encode("latin-1", "replace").decode("latin-1")
+        pdf.multi_cell(0, 8, s)
+        pdf.ln(5)
+    # fpdf2 returns a bytearray, so there is no str -> latin-1 round-trip
+    return bytes(pdf.output())
@@ -0,0 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+from utils import drive_utils, firebase_utils
+
+# Background worker for report persistence so the Results page doesn't wait on Drive/Firebase
+executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="report")
+
+def _persist_report(pdf_bytes, filename, user_data, score, maturity, payment_status):
+    pdf_link = drive_utils.upload_pdf_to_drive(pdf_bytes, filename)
+    # Wait for the batched write so a failed commit surfaces on this task
+    firebase_utils.save_submission(user_data, score, maturity, pdf_link, payment_status).result()
+    return pdf_link
+
+def enqueue_report(pdf_bytes, filename, user_data, score, maturity, payment_status="Success"):
+    return executor.submit(_persist_report, pdf_bytes, filename, user_data, score, maturity, payment_status)